@@ -8,8 +8,18 @@ if not os.path.exists(nltk_data_dir):
 
 nltk.data.path.append(nltk_data_dir)
 
-# Download necessary NLTK data to the specified directory
-nltk.download('punkt', download_dir=nltk_data_dir)
-nltk.download('stopwords', download_dir=nltk_data_dir)
-nltk.download('averaged_perceptron_tagger_eng', download_dir=nltk_data_dir)
-nltk.download('punkt_tab', download_dir=nltk_data_dir)
+# NLTK resources the backend needs, keyed by package name
+REQUIRED = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'averaged_perceptron_tagger_eng': 'taggers/averaged_perceptron_tagger_eng',
+    'punkt_tab': 'tokenizers/punkt_tab',
+}
+
+# Only download what isn't already in nltk_data_dir (e.g. from a cached build)
+for package, resource in REQUIRED.items():
+    try:
+        # Probe only the directory the backend reads from, not the whole search path
+        nltk.data.find(resource, paths=[nltk_data_dir])
+    except LookupError:
+        nltk.download(package, download_dir=nltk_data_dir)
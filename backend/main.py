@@ -1,9 +1,16 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
 import nltk
 import os
+import hashlib
+import threading
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from collections import Counter
@@ -13,54 +20,87 @@ nltk_data_dir = os.path.join(os.path.dirname(__file__), 'nltk_data')
 if os.path.exists(nltk_data_dir):
     nltk.data.path.append(nltk_data_dir)
 
+# ORCID iD format, e.g. 0000-0001-2345-6789
+ORCID_RE = re.compile(r'^\d{4}-\d{4}-\d{4}-\d{3}[\dX]$')
+
+STOP_WORDS = frozenset(stopwords.words('english'))
+
+# Shared HTTP session so OpenAlex calls reuse pooled keep-alive connections.
+# OpenAlex is the only host we talk to, so a single pool sized for the
+# worker's threads is enough.
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "researchwrapped (https://nevinpai.github.io/researchwrapped/)"})
+SESSION.mount("https://api.openalex.org", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+))
+
+# OpenAlex results only change when new works are ingested, so repeat lookups
+# for the same researcher are served from memory for an hour. Only the
+# deinverted abstracts and author name are kept, not the raw payload.
+RESEARCHER_CACHE = TTLCache(maxsize=256, ttl=3600)
+RESEARCHER_CACHE_LOCK = threading.Lock()
+ANALYSIS_CACHE = TTLCache(maxsize=256, ttl=3600)
+
 app = Flask(__name__)
 CORS(app, origins=["https://nevinpai.github.io", "http://127.0.0.1:5500", "null"])
 
+def fetch_works(orcid_id_only):
+    """
+    Fetches the last 10 works for a bare ORCID iD.
+    """
+    # Only request the fields we read to keep the response small
+    url = (
+        f"https://api.openalex.org/works?filter=author.orcid:https://orcid.org/{orcid_id_only}"
+        "&per-page=10&select=abstract_inverted_index,authorships"
+    )
+    response = SESSION.get(url)
+    response.raise_for_status()
+    return orjson.loads(response.content).get('results', [])
+
 def get_researcher_info(orcid_id):
     """
-    Fetches the last 10 works of a researcher and their display name.
+    Fetches the abstracts of a researcher's last 10 works and their display name.
     """
     # Handle both full URL and just the ID
     orcid_id_only = orcid_id.split('/')[-1]
     
-    url = f"https://api.openalex.org/works?filter=author.orcid:https://orcid.org/{orcid_id_only}&per-page=10"
+    with RESEARCHER_CACHE_LOCK:
+        cached_info = RESEARCHER_CACHE.get(orcid_id_only)
+    if cached_info is not None:
+        return cached_info
+    
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        results = response.json().get('results', [])
-        if not results:
-            return None, None
-        
-        author_name = "Unknown Author"
-        # Find the author in the first paper's authorships that matches the ORCID
-        for authorship in results[0].get('authorships', []):
-            author_info = authorship.get('author', {})
-            if author_info.get('orcid') and author_info['orcid'].endswith(orcid_id_only):
-                author_name = author_info.get('display_name', author_name)
-                break  # Found the correct author
-
-        return results, author_name
-    except requests.exceptions.RequestException as e:
+        results = fetch_works(orcid_id_only)
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error fetching data from OpenAlex: {e}")
         return None, None
-
-def get_abstract(work):
-    """
-    Extracts the abstract from a work object by fetching the full work details.
-    """
-    if not work or 'id' not in work:
-        return None
-
-    work_id = work['id'].split('/')[-1]
-    url = f"https://api.openalex.org/works/{work_id}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        work_details = response.json()
-        return work_details.get('abstract_inverted_index', {})
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching work details from OpenAlex: {e}")
-        return None
+    
+    if not results:
+        return None, None
+    
+    author_name = "Unknown Author"
+    # Find the author in the first paper's authorships that matches the ORCID
+    for authorship in results[0].get('authorships', []):
+        author_info = authorship.get('author', {})
+        if author_info.get('orcid') and author_info['orcid'].endswith(orcid_id_only):
+            author_name = author_info.get('display_name', author_name)
+            break  # Found the correct author
+    
+    # The /works listing already carries each abstract inline, so no
+    # per-work follow-up request is needed.
+    abstracts = tuple(
+        deinvert_abstract(work['abstract_inverted_index'])
+        for work in results
+        if work.get('abstract_inverted_index')
+    )
+    
+    # Don't cache empty results so newly indexed works show up right away
+    if abstracts:
+        with RESEARCHER_CACHE_LOCK:
+            RESEARCHER_CACHE[orcid_id_only] = (abstracts, author_name)
+    return abstracts, author_name
 
 def deinvert_abstract(inverted_index):
     """
@@ -69,45 +109,53 @@ def deinvert_abstract(inverted_index):
     if not inverted_index:
         return ""
     
-    terms = []
+    max_index = max((index for indices in inverted_index.values() for index in indices), default=-1)
+    if max_index < 0:
+        return ""
+    
+    terms = [""] * (max_index + 1)
     for term, indices in inverted_index.items():
         for index in indices:
-            while len(terms) <= index:
-                terms.append("")
             terms[index] = term
     return " ".join(terms)
 
+def abstracts_key(abstracts):
+    """
+    Cache key for a set of abstracts: a digest, so the texts aren't kept as key data.
+    """
+    digest = hashlib.sha256("\0".join(abstracts).encode('utf-8')).hexdigest()
+    return hashkey(digest)
+
+@cached(ANALYSIS_CACHE, key=abstracts_key, lock=threading.Lock())
 def analyze_abstracts(abstracts):
     """
     Analyzes abstracts for word counts, common verbs, and common nouns.
     """
-    stop_words = set(stopwords.words('english'))
-    
-    text = " ".join(abstracts)
-    words = word_tokenize(text.lower())
-    
-    # Filter for alphabetic words and remove stopwords
-    filtered_words = [word for word in words if word.isalpha() and word not in stop_words]
+    word_counts, verb_counts, noun_counts = Counter(), Counter(), Counter()
+    total_words = 0
     
-    # Overall word frequency
-    word_counts = Counter(filtered_words)
-    
-    # Part-of-speech tagging
-    tagged_words = nltk.pos_tag(filtered_words)
-    
-    # Most common verbs (VB, VBD, VBG, VBN, VBP, VBZ)
-    verbs = [word for word, tag in tagged_words if tag.startswith('VB')]
-    verb_counts = Counter(verbs)
-    
-    # Most common nouns (NN, NNS, NNP, NNPS)
-    nouns = [word for word, tag in tagged_words if tag.startswith('NN')]
-    noun_counts = Counter(nouns)
+    # Process each abstract on its own so the tagger never sees words
+    # spliced across document boundaries
+    for abstract in abstracts:
+        words = word_tokenize(abstract.lower())
+        
+        # Filter for alphabetic words and remove stopwords
+        filtered_words = [word for word in words if word.isalpha() and word not in STOP_WORDS]
+        total_words += len(filtered_words)
+        
+        # Count overall words, verbs (VB*) and nouns (NN*) in a single pass
+        for word, tag in nltk.pos_tag(filtered_words):
+            word_counts[word] += 1
+            if tag.startswith('VB'):
+                verb_counts[word] += 1
+            elif tag.startswith('NN'):
+                noun_counts[word] += 1
     
     # Vocabulary Diversity (Lexical Density)
-    diversity_score = (len(word_counts) / len(filtered_words)) * 100 if filtered_words else 0
+    diversity_score = (len(word_counts) / total_words) * 100 if total_words else 0
     
     return {
-        "total_words": len(filtered_words),
+        "total_words": total_words,
         "unique_words": len(word_counts),
         "diversity_score": round(diversity_score, 2),
         "most_common_words": word_counts.most_common(5),
@@ -115,6 +163,9 @@ def analyze_abstracts(abstracts):
         "most_common_nouns": noun_counts.most_common(5),
     }
 
+# Warm the tagger at startup so the first request doesn't pay the load cost
+nltk.pos_tag(["warm"])
+
 @app.route('/api/process', methods=['POST'])
 def process_researcher():
     data = request.get_json()
@@ -123,26 +174,20 @@ def process_researcher():
     if not researcher_id:
         return jsonify({'error': 'Researcher ID is required'}), 400
 
-    # Validate ORCID format (e.g., 0000-0001-2345-6789)
-    orcid_pattern = re.compile(r'^\d{4}-\d{4}-\d{4}-\d{3}[\dX]$')
-    if not orcid_pattern.match(researcher_id.split('/')[-1]):
+    # Validate ORCID format
+    if not ORCID_RE.match(researcher_id.split('/')[-1]):
         return jsonify({'error': 'Invalid ORCID format'}), 400
 
-    works, author_name = get_researcher_info(researcher_id)
+    abstracts, author_name = get_researcher_info(researcher_id)
 
-    if works is None:
+    if abstracts is None:
         return jsonify({'error': 'Could not fetch data from OpenAlex'}), 500
 
-    abstracts = []
-    for work in works:
-        inverted_abstract = get_abstract(work)
-        if inverted_abstract:
-            abstracts.append(deinvert_abstract(inverted_abstract))
-
     if not abstracts:
         return jsonify({'error': 'No abstracts found for this researcher'}), 404
 
-    analysis_results = analyze_abstracts(abstracts)
+    # Copy so the cached analysis isn't mutated
+    analysis_results = dict(analyze_abstracts(abstracts))
     analysis_results['author_name'] = author_name
 
     return jsonify(analysis_results)